@@ -0,0 +1,27 @@
+# Generated by Django 5.1.6 on 2026-10-14 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='trip',
+            index=models.Index(fields=['-created_at'], name='trip_created_at_idx'),
+        ),
+        migrations.AlterField(
+            model_name='logsheet',
+            name='trip',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='log_sheets', to='api.trip'),
+        ),
+        migrations.AddIndex(
+            model_name='logsheet',
+            index=models.Index(fields=['trip', 'date'], name='logsheet_trip_date_idx'),
+        ),
+    ]
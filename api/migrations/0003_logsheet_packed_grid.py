@@ -0,0 +1,89 @@
+# Generated by Django 5.1.6 on 2026-10-14 09:30
+
+from django.db import migrations, models
+
+GRID_CODES = {'OFF': 0, 'ON': 1, 'D': 2, 'SB': 3}
+GRID_LABELS = ['OFF', 'ON', 'D', 'SB']
+TOTAL_KEYS = ['driving', 'on_duty', 'off_duty', 'sleeper']
+BATCH_SIZE = 500
+
+
+def legacy_totals(log_data):
+    # Early rows stored flat total_* keys instead of a totals dict
+    if 'totals' in log_data:
+        return log_data['totals']
+    return {key: log_data.get(f'total_{key}', 0) for key in TOTAL_KEYS}
+
+
+def split_log_data(apps, schema_editor):
+    LogSheet = apps.get_model('api', 'LogSheet')
+    batch = []
+    for sheet in LogSheet.objects.iterator(chunk_size=BATCH_SIZE):
+        packed = bytearray(24)
+        for i, label in enumerate(sheet.log_data.get('grid', [])[:96]):
+            packed[i // 4] |= GRID_CODES.get(label, 0) << (2 * (i % 4))
+        sheet.grid = bytes(packed)
+        sheet.events = sheet.log_data.get('events', [])
+        sheet.totals = legacy_totals(sheet.log_data)
+        batch.append(sheet)
+        if len(batch) >= BATCH_SIZE:
+            LogSheet.objects.bulk_update(batch, ['grid', 'events', 'totals'])
+            batch = []
+    LogSheet.objects.bulk_update(batch, ['grid', 'events', 'totals'])
+
+
+def join_log_data(apps, schema_editor):
+    LogSheet = apps.get_model('api', 'LogSheet')
+    batch = []
+    for sheet in LogSheet.objects.iterator(chunk_size=BATCH_SIZE):
+        grid = bytes(sheet.grid)
+        sheet.log_data = {
+            'date': sheet.date.isoformat(),
+            'grid': [GRID_LABELS[(grid[i // 4] >> (2 * (i % 4))) & 0b11] for i in range(96)],
+            'events': sheet.events,
+            'totals': sheet.totals
+        }
+        batch.append(sheet)
+        if len(batch) >= BATCH_SIZE:
+            LogSheet.objects.bulk_update(batch, ['log_data'])
+            batch = []
+    LogSheet.objects.bulk_update(batch, ['log_data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_trip_logsheet_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='logsheet',
+            name='grid',
+            field=models.BinaryField(default=bytes(24)),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='logsheet',
+            name='events',
+            field=models.JSONField(default=list),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='logsheet',
+            name='totals',
+            field=models.JSONField(default=dict),
+            preserve_default=False,
+        ),
+        # Nullable before removal so the reverse can re-add the column, then refill it
+        migrations.AlterField(
+            model_name='logsheet',
+            name='log_data',
+            field=models.JSONField(null=True),
+        ),
+        migrations.RunPython(split_log_data, join_log_data),
+        migrations.RemoveField(
+            model_name='logsheet',
+            name='log_data',
+        ),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
 
+class TripQuerySet(models.QuerySet):
+    def with_logs(self):
+        return self.prefetch_related('log_sheets')
+
 class Trip(models.Model):
     current_location = models.CharField(max_length=255)
     pickup_location = models.CharField(max_length=255)
@@ -7,13 +11,24 @@ class Trip(models.Model):
     current_cycle_used = models.FloatField()
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = TripQuerySet.as_manager()
+    
+    class Meta:
+        indexes = [models.Index(fields=['-created_at'], name='trip_created_at_idx')]
+    
     def __str__(self):
         return f"Trip from {self.current_location} to {self.dropoff_location}"
 
 class LogSheet(models.Model):
-    trip = models.ForeignKey(Trip, related_name='log_sheets', on_delete=models.CASCADE)
+    # (trip, date) index below covers trip lookups, so skip the FK's own index
+    trip = models.ForeignKey(Trip, related_name='log_sheets', on_delete=models.CASCADE, db_index=False)
     date = models.DateField()
-    log_data = models.JSONField() 
+    grid = models.BinaryField()
+    events = models.JSONField()
+    totals = models.JSONField()
+    
+    class Meta:
+        indexes = [models.Index(fields=['trip', 'date'], name='logsheet_trip_date_idx')]
     
     def __str__(self):
         return f"Log for {self.date} - {self.trip}"
\ No newline at end of file
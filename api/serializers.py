@@ -1,16 +1,39 @@
 from rest_framework import serializers
 from .models import Trip, LogSheet
+from eld.grid import unpack_grid
+from eld.utils import normalize_address
 
 class TripInputSerializer(serializers.Serializer):
     current_location = serializers.CharField(max_length=255, trim_whitespace=True)
     pickup_location = serializers.CharField(max_length=255, trim_whitespace=True)
     dropoff_location = serializers.CharField(max_length=255, trim_whitespace=True)
     current_cycle_used = serializers.FloatField(min_value=0, max_value=70)
+    
+    # Canonical form so "Denver, CO" and "denver,  co." share cache entries
+    def _canonical_location(self, value):
+        normalized = normalize_address(value)
+        if not normalized:
+            raise serializers.ValidationError("Location must contain more than punctuation.")
+        return normalized
+    
+    def validate_current_location(self, value):
+        return self._canonical_location(value)
+    
+    def validate_pickup_location(self, value):
+        return self._canonical_location(value)
+    
+    def validate_dropoff_location(self, value):
+        return self._canonical_location(value)
 
 class LogSheetSerializer(serializers.ModelSerializer):
+    grid = serializers.SerializerMethodField()
+    
     class Meta:
         model = LogSheet
-        fields = ['date', 'log_data']
+        fields = ['date', 'grid', 'events', 'totals']
+    
+    def get_grid(self, obj):
+        return unpack_grid(obj.grid)
 
 class TripSerializer(serializers.ModelSerializer):
     log_sheets = LogSheetSerializer(many=True, read_only=True)
@@ -0,0 +1,52 @@
+import hashlib
+from datetime import date
+from celery import shared_task
+from django.core.cache import caches
+from django.db import transaction, connections, router
+from .models import Trip, LogSheet
+from eld.utils import ELDLogGenerator
+
+PLAN_CACHE_TTL = 60 * 60
+
+# Log dates start from today, so the day is part of the key alongside the inputs
+def plan_trip(trip_input):
+    raw = '|'.join([
+        trip_input['current_location'],
+        trip_input['pickup_location'],
+        trip_input['dropoff_location'],
+        str(trip_input['current_cycle_used']),
+        date.today().isoformat()
+    ])
+    key = f"plan:{hashlib.sha1(raw.encode()).hexdigest()}"
+    trip_data = caches['plans'].get(key)
+    if trip_data is None:
+        trip_data = ELDLogGenerator(trip_input).generate_log_sheets()
+        caches['plans'].set(key, trip_data, PLAN_CACHE_TTL)
+    return trip_data
+
+def log_sheet_rows(trip, log_sheets):
+    return [
+        LogSheet(
+            trip=trip,
+            date=log.pop('_date_obj'),
+            grid=log.pop('_grid_packed'),
+            events=log['events'],
+            totals=log['totals']
+        )
+        for log in log_sheets
+    ]
+
+# LogSheet PKs are never read back; on Postgres ignore_conflicts drops the RETURNING clause
+def insert_log_sheets(rows):
+    vendor = connections[router.db_for_write(LogSheet)].vendor
+    LogSheet.objects.bulk_create(rows, batch_size=200, ignore_conflicts=vendor == 'postgresql')
+
+@shared_task
+def plan_trip_task(trip_input):
+    trip_data = plan_trip(trip_input)
+    
+    with transaction.atomic():
+        trip = Trip.objects.create(**trip_input)
+        insert_log_sheets(log_sheet_rows(trip, trip_data['log_sheets']))
+    
+    return trip_data
@@ -1,3 +1,105 @@
-from django.test import TestCase
+from unittest import mock
+from django.test import SimpleTestCase, TestCase, override_settings
+from kombu.exceptions import OperationalError
+from rest_framework.test import APIClient
+from backend.celery import app as celery_app
+from eld.utils import ELDLogGenerator
+from .models import Trip, LogSheet
+from .views import MAX_BATCH_TRIPS
 
-# Create your tests here.
+TRIP = {'current_location': 'a', 'pickup_location': 'b', 'dropoff_location': 'c', 'current_cycle_used': 10}
+
+
+class PlanTripBatchViewTests(SimpleTestCase):
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_rejects_batch_over_limit(self):
+        with mock.patch('api.views.prefetch_coordinates') as prefetch:
+            response = self.client.post('/api/plan-trip-batch/', [TRIP] * (MAX_BATCH_TRIPS + 1), format='json')
+        self.assertEqual(response.status_code, 400)
+        prefetch.assert_not_called()
+
+    def test_rejects_batch_with_failed_geocode_without_planning(self):
+        coords = {'a': [1.0, 2.0], 'b': None, 'c': [3.0, 4.0]}
+        with mock.patch('api.views.prefetch_coordinates', return_value=coords), \
+                mock.patch('api.views.plan_trip') as plan:
+            response = self.client.post('/api/plan-trip-batch/', [TRIP], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Failed to geocode: b'})
+        plan.assert_not_called()
+
+
+ROUTE = {
+    'legs': [
+        {'from': 'a', 'to': 'b', 'distance': 110, 'duration': 2, 'geometry': ''},
+        {'from': 'b', 'to': 'c', 'distance': 110, 'duration': 2, 'geometry': ''}
+    ],
+    'total_distance': 220,
+    'total_duration': 4
+}
+
+def _preset_route(generator):
+    generator.route_details = ROUTE
+    return ROUTE
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'plans': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'plans'},
+})
+class PlanTripViewTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        eager = celery_app.conf.task_always_eager
+        celery_app.conf.task_always_eager = True
+        self.addCleanup(setattr, celery_app.conf, 'task_always_eager', eager)
+
+    def test_post_queues_task_and_writes_rows(self):
+        with mock.patch.object(ELDLogGenerator, 'calculate_route', _preset_route):
+            response = self.client.post('/api/plan-trip/', TRIP, format='json')
+        self.assertEqual(response.status_code, 202)
+        self.assertIn('task_id', response.json())
+
+        trip = Trip.objects.get()
+        self.assertEqual(trip.current_location, 'a')
+        sheets = LogSheet.objects.filter(trip=trip)
+        self.assertTrue(sheets.exists())
+        self.assertTrue(all(len(bytes(sheet.grid)) == 24 for sheet in sheets))
+
+    def test_post_returns_503_when_broker_is_down(self):
+        with mock.patch('api.views.plan_trip_task.delay', side_effect=OperationalError('no broker')):
+            response = self.client.post('/api/plan-trip/', TRIP, format='json')
+        self.assertEqual(response.status_code, 503)
+        self.assertFalse(Trip.objects.exists())
+
+
+class PlanTripResultViewTests(SimpleTestCase):
+    TASK_ID = '00000000-0000-0000-0000-000000000000'
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def _get(self, **result):
+        with mock.patch('api.views.AsyncResult') as async_result:
+            async_result.return_value = mock.Mock(**result)
+            return self.client.get(f'/api/plan-trip/{self.TASK_ID}/')
+
+    def test_success_returns_plan(self):
+        response = self._get(**{'successful.return_value': True, 'result': {'log_sheets': []}})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'log_sheets': []})
+
+    def test_failure_returns_error(self):
+        response = self._get(**{
+            'successful.return_value': False,
+            'failed.return_value': True,
+            'result': ValueError('Failed to calculate route')
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Failed to calculate route'})
+
+    def test_pending_returns_status(self):
+        response = self._get(**{'successful.return_value': False, 'failed.return_value': False, 'status': 'PENDING'})
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {'task_id': self.TASK_ID, 'status': 'PENDING'})
@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import PlanTripView, health_check
+from .views import PlanTripView, PlanTripResultView, PlanTripBatchView, health_check
 
 urlpatterns = [
     path('plan-trip/', PlanTripView.as_view(), name='plan-trip'),
+    path('plan-trip/<uuid:task_id>/', PlanTripResultView.as_view(), name='plan-trip-result'),
+    path('plan-trip-batch/', PlanTripBatchView.as_view(), name='plan-trip-batch'),
     path('health/', health_check, name='health_check'),
 ]
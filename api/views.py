@@ -1,11 +1,32 @@
+import json
+from celery.result import AsyncResult
+from kombu.exceptions import OperationalError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import api_view
+from django.db import transaction
+from django.http import HttpResponse
 from .serializers import TripInputSerializer
-from .models import Trip, LogSheet
-from eld.utils import ELDLogGenerator
-from datetime import datetime
+from .models import Trip
+from .tasks import plan_trip, log_sheet_rows, insert_log_sheets, plan_trip_task
+from eld.utils import prefetch_coordinates
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Planner output is plain JSON-safe data, so dump it directly instead of going through DRF's renderer
+def _json_response(data, status_code):
+    if orjson is not None:
+        body = orjson.dumps(data)
+    else:
+        body = json.dumps(data, separators=(',', ':'))
+    return HttpResponse(body, status=status_code, content_type='application/json')
+
+# Batch trips are planned inline, so cap how much ORS and CPU work one request can trigger
+MAX_BATCH_TRIPS = 25
 
 @api_view(['GET'])
 def health_check(request):
@@ -18,17 +39,46 @@ class PlanTripView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            generator = ELDLogGenerator(serializer.validated_data)
-            trip_data = generator.generate_log_sheets()
+            task = plan_trip_task.delay(serializer.validated_data)
+        except OperationalError:
+            return Response({'error': 'Trip planning is temporarily unavailable'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        return Response({'task_id': task.id}, status=status.HTTP_202_ACCEPTED)
+
+class PlanTripResultView(APIView):
+    def get(self, request, task_id):
+        result = AsyncResult(str(task_id))
+        if result.successful():
+            return _json_response(result.result, status.HTTP_200_OK)
+        if result.failed():
+            return Response({'error': str(result.result)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'task_id': str(task_id), 'status': result.status}, status=status.HTTP_202_ACCEPTED)
+
+class PlanTripBatchView(APIView):
+    def post(self, request):
+        serializer = TripInputSerializer(data=request.data, many=True, allow_empty=False, max_length=MAX_BATCH_TRIPS)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            trips_input = serializer.validated_data
+            coords = prefetch_coordinates(
+                trip[key] for trip in trips_input
+                for key in ('current_location', 'pickup_location', 'dropoff_location')
+            )
+            # Failed lookups aren't cached, so planning would geocode them again; fail fast instead
+            failed = sorted(address for address, coord in coords.items() if coord is None)
+            if failed:
+                return Response({'error': f"Failed to geocode: {', '.join(failed)}"}, status=status.HTTP_400_BAD_REQUEST)
+            results = [plan_trip(trip) for trip in trips_input]
             
-            trip = Trip.objects.create(**serializer.validated_data)
-            for log in trip_data['log_sheets']:
-                LogSheet.objects.create(
-                    trip=trip,
-                    date=datetime.strptime(log['date'], '%Y-%m-%d').date(),
-                    log_data=log
-                )
+            with transaction.atomic():
+                trips = Trip.objects.bulk_create([Trip(**trip) for trip in trips_input])
+                insert_log_sheets([
+                    sheet
+                    for trip, trip_data in zip(trips, results)
+                    for sheet in log_sheet_rows(trip, trip_data['log_sheets'])
+                ])
             
-            return Response(trip_data, status=status.HTTP_201_CREATED)
+            return _json_response(results, status.HTTP_201_CREATED)
         except Exception as e:
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -68,6 +68,28 @@ DATABASES = {
     }
 }
 
+# Redis so geocode/route lookups survive process restarts without scanning on every write;
+# plan payloads get their own database so they can't evict the long-lived geocode keys
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('CACHE_URL', 'redis://localhost:6379/2'),
+    },
+    'plans': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv('PLAN_CACHE_URL', 'redis://localhost:6379/3'),
+    },
+}
+
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/1')
+CELERY_TASK_SERIALIZER = 'json'
+CELERY_RESULT_SERIALIZER = 'json'
+CELERY_ACCEPT_CONTENT = ['json']
+CELERY_RESULT_EXPIRES = 60 * 60
+# Queued tasks show as STARTED once a worker picks them up; unknown IDs still read as PENDING
+CELERY_TASK_TRACK_STARTED = True
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -0,0 +1,15 @@
+# Compact storage for the duty-status grid: 96 quarter-hour slots, 2 bits each
+GRID_SLOTS = 96
+GRID_CODES = {'OFF': 0, 'ON': 1, 'D': 2, 'SB': 3}
+GRID_LABELS = ['OFF', 'ON', 'D', 'SB']
+
+def pack_codes(codes):
+    # Slot i goes in byte i // 4 at bit offset 2 * (i % 4); one step per packed byte
+    return bytes(a | b << 2 | c << 4 | d << 6 for a, b, c, d in zip(codes[0::4], codes[1::4], codes[2::4], codes[3::4]))
+
+def pack_grid(grid):
+    return pack_codes(bytes(GRID_CODES[label] for label in grid))
+
+def unpack_grid(data):
+    data = bytes(data)
+    return [GRID_LABELS[(data[i // 4] >> (2 * (i % 4))) & 0b11] for i in range(GRID_SLOTS)]
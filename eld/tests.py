@@ -1,3 +1,66 @@
-from django.test import TestCase
+from django.test import SimpleTestCase
+from .grid import GRID_SLOTS, GRID_CODES, GRID_LABELS, pack_codes, pack_grid, unpack_grid
+from .utils import ELDLogGenerator
 
-# Create your tests here.
+
+class GridPackingTests(SimpleTestCase):
+    def test_round_trip_all_labels_all_slots(self):
+        grid = [GRID_LABELS[i % len(GRID_LABELS)] for i in range(GRID_SLOTS)]
+        packed = pack_grid(grid)
+        self.assertEqual(len(packed), GRID_SLOTS // 4)
+        self.assertEqual(unpack_grid(packed), grid)
+
+    def test_bit_layout(self):
+        # Slot i lives in byte i // 4 at bit offset 2 * (i % 4); stored rows rely on this
+        grid = ['OFF'] * GRID_SLOTS
+        grid[0:4] = ['OFF', 'ON', 'D', 'SB']
+        grid[-1] = 'SB'
+        packed = pack_grid(grid)
+        self.assertEqual(packed[0], 0b11100100)
+        self.assertEqual(packed[-1], 0b11000000)
+        self.assertEqual(unpack_grid(memoryview(packed)), grid)
+
+
+    def test_pack_codes_matches_pack_grid(self):
+        grid = [GRID_LABELS[(i * 7) % len(GRID_LABELS)] for i in range(GRID_SLOTS)]
+        codes = bytearray(GRID_CODES[label] for label in grid)
+        self.assertEqual(pack_codes(codes), pack_grid(grid))
+
+class ExhaustedCycleTests(SimpleTestCase):
+    def setUp(self):
+        self.generator = ELDLogGenerator({
+            'current_location': 'a',
+            'pickup_location': 'b',
+            'dropoff_location': 'c',
+            'current_cycle_used': 70
+        })
+        # Preset route so no ORS calls are made
+        self.generator.route_details = {
+            'legs': [
+                {'from': 'a', 'to': 'b', 'distance': 110, 'duration': 2, 'geometry': ''},
+                {'from': 'b', 'to': 'c', 'distance': 110, 'duration': 2, 'geometry': ''}
+            ],
+            'total_distance': 220,
+            'total_duration': 4
+        }
+
+    def test_restart_accounts_for_full_34_hours(self):
+        log_sheets = self.generator.generate_log_sheets()['log_sheets']
+        first, second = log_sheets[0], log_sheets[1]
+
+        self.assertEqual(first['events'], [
+            {'status': 'Off duty', 'start': '08:00', 'end': '24:00', 'duration': 16.0, 'activity': '34-hour restart'}
+        ])
+        self.assertEqual(first['totals'], {'driving': 0, 'on_duty': 0, 'off_duty': 16.0, 'sleeper': 0})
+        self.assertEqual(first['grid'], ['OFF'] * GRID_SLOTS)
+
+        restart = second['events'][0]
+        self.assertEqual((restart['start'], restart['end'], restart['duration']), ('00:00', '18:00', 18.0))
+        self.assertEqual(first['totals']['off_duty'] + restart['duration'], 34)
+        self.assertEqual(second['events'][1]['activity'], 'Loading')
+        self.assertEqual(second['events'][1]['start'], '18:00')
+        self.assertEqual(second['totals']['driving'], 4)
+
+    def test_finalized_days_carry_packed_grid(self):
+        for log in self.generator.generate_log_sheets()['log_sheets']:
+            self.assertEqual(unpack_grid(log['_grid_packed']), log['grid'])
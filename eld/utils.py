@@ -1,10 +1,122 @@
 import requests
+import hashlib
 import logging
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from .grid import GRID_SLOTS, GRID_CODES, GRID_LABELS, pack_codes
 
 logger = logging.getLogger(__name__)
 
+# Shared session so repeated ORS calls reuse the pooled TLS connection
+_ORS_SESSION = requests.Session()
+_ORS_SESSION.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    # ORS directions POSTs are read-only lookups, so they are safe to retry too
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.4,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=['GET', 'POST'],
+        raise_on_status=False
+    )
+))
+_ORS_SESSION.headers['Authorization'] = settings.OPENROUTE_API_KEY
+
+GEOCODE_CACHE_TTL = 60 * 60 * 24 * 30
+ROUTE_CACHE_TTL = 60 * 60 * 24 * 7
+
+_STATUS_CODE = {
+    'Driving': GRID_CODES['D'],
+    'On duty': GRID_CODES['ON'],
+    'Off duty': GRID_CODES['OFF'],
+    'Sleeper berth': GRID_CODES['SB']
+}
+_TOTAL_KEY = {'Driving': 'driving', 'On duty': 'on_duty', 'Off duty': 'off_duty', 'Sleeper berth': 'sleeper'}
+
+def normalize_address(address):
+    return ' '.join(address.split()).lower().rstrip('.,;:!? ')
+
+def _fetch_coordinates(address):
+    url = "https://api.openrouteservice.org/geocode/search"
+    params = {'text': address, 'size': 1}
+    
+    try:
+        response = _ORS_SESSION.get(url, params=params, timeout=5)
+        if response.status_code == 200:
+            data = response.json()
+            if 'features' in data and data['features']:
+                coords = data['features'][0]['geometry']['coordinates']
+                logger.info("Geocoded %s to %s", address, coords)
+                return coords
+            logger.warning("No features for %s: %s", address, response.text)
+        else:
+            logger.error("Geocode failed for %s: %s - %s", address, response.status_code, response.text)
+    except Exception as e:
+        logger.error("Geocode exception for %s: %s", address, e)
+    return None
+
+@lru_cache(maxsize=4096)
+def _cached_coordinates(normalized):
+    key = f"ors:geo:{hashlib.sha1(normalized.encode()).hexdigest()}"
+    coords = cache.get(key)
+    if coords is None:
+        coords = _fetch_coordinates(normalized)
+        if coords is None:
+            # Raise instead of returning so failed lookups stay out of the LRU
+            raise LookupError(normalized)
+        cache.set(key, coords, GEOCODE_CACHE_TTL)
+    return coords
+
+# Geocode each unique address once; later get_coordinates calls hit the warmed cache
+def prefetch_coordinates(addresses, max_workers=10):
+    unique = list({normalize_address(a) for a in addresses})
+    def lookup(normalized):
+        try:
+            return _cached_coordinates(normalized)
+        except LookupError:
+            return None
+    with ThreadPoolExecutor(max_workers=max_workers) as ex:
+        return dict(zip(unique, ex.map(lookup, unique)))
+
+def _fetch_route_leg(start_coords, end_coords):
+    url = "https://api.openrouteservice.org/v2/directions/driving-hgv"
+    payload = {'coordinates': [start_coords, end_coords], 'instructions': True, 'geometry': True}
+    
+    try:
+        response = _ORS_SESSION.post(url, json=payload, timeout=5)
+        if response.status_code == 200:
+            route = response.json()['routes'][0]
+            distance_miles = route['summary']['distance'] / 1609.34
+            duration_hours = route['summary']['duration'] / 3600
+            logger.info("Route from %s to %s: %s mi, %s hr", start_coords, end_coords, distance_miles, duration_hours)
+            return {
+                'distance': round(distance_miles, 2),
+                'duration': round(duration_hours, 2),
+                'geometry': route['geometry']
+            }
+        logger.error("Route failed: %s - %s", response.status_code, response.text)
+        return None
+    except Exception as e:
+        logger.error("Route exception: %s", e)
+        return None
+
+@lru_cache(maxsize=1024)
+def _cached_route_leg(s0, s1, e0, e1):
+    key = f"ors:route:{s0},{s1}->{e0},{e1}"
+    leg = cache.get(key)
+    if leg is None:
+        leg = _fetch_route_leg([s0, s1], [e0, e1])
+        if leg is None:
+            raise LookupError(key)
+        cache.set(key, leg, ROUTE_CACHE_TTL)
+    return leg
+
 class ELDLogGenerator:
     def __init__(self, trip_data):
         self.current_location = trip_data['current_location']
@@ -17,6 +129,7 @@ class ELDLogGenerator:
         self.max_drive_hours = 11
         self.max_on_duty_hours = 14
         self.min_rest_hours = 10
+        self.restart_hours = 34
         self.max_cycle_hours = 70
         self.fuel_interval = 1000
         self.fuel_time = 0.5
@@ -24,59 +137,35 @@ class ELDLogGenerator:
         self.avg_speed = 55
 
     def get_coordinates(self, address):
-        url = "https://api.openrouteservice.org/geocode/search"
-        headers = {'Authorization': settings.OPENROUTE_API_KEY}
-        params = {'text': address, 'size': 1}
-        
         try:
-            response = requests.get(url, headers=headers, params=params, timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                if 'features' in data and data['features']:
-                    coords = data['features'][0]['geometry']['coordinates']
-                    logger.info(f"Geocoded {address} to {coords}")
-                    return coords
-                logger.warning(f"No features for {address}: {response.text}")
-            else:
-                logger.error(f"Geocode failed for {address}: {response.status_code} - {response.text}")
-        except Exception as e:
-            logger.error(f"Geocode exception for {address}: {str(e)}")
-        return None
+            return _cached_coordinates(normalize_address(address))
+        except LookupError:
+            return None
 
     def get_route_leg(self, start_coords, end_coords):
-        url = "https://api.openrouteservice.org/v2/directions/driving-hgv"
-        headers = {'Authorization': settings.OPENROUTE_API_KEY, 'Content-Type': 'application/json'}
-        payload = {'coordinates': [start_coords, end_coords], 'instructions': True, 'geometry': True}
-        
+        s0, s1 = (round(c, 5) for c in start_coords)
+        e0, e1 = (round(c, 5) for c in end_coords)
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=5)
-            if response.status_code == 200:
-                route = response.json()['routes'][0]
-                distance_miles = route['summary']['distance'] / 1609.34
-                duration_hours = route['summary']['duration'] / 3600
-                logger.info(f"Route from {start_coords} to {end_coords}: {distance_miles} mi, {duration_hours} hr")
-                return {
-                    'distance': round(distance_miles, 2),
-                    'duration': round(duration_hours, 2),
-                    'geometry': route['geometry']
-                }
-            logger.error(f"Route failed: {response.status_code} - {response.text}")
-            return None
-        except Exception as e:
-            logger.error(f"Route exception: {str(e)}")
+            return _cached_route_leg(s0, s1, e0, e1)
+        except LookupError:
             return None
 
     def calculate_route(self):
-        coords = {
-            'current': self.get_coordinates(self.current_location),
-            'pickup': self.get_coordinates(self.pickup_location),
-            'dropoff': self.get_coordinates(self.dropoff_location)
+        locations = {
+            'current': self.current_location,
+            'pickup': self.pickup_location,
+            'dropoff': self.dropoff_location
         }
+        with ThreadPoolExecutor(max_workers=3) as ex:
+            futures = {k: ex.submit(self.get_coordinates, loc) for k, loc in locations.items()}
+            coords = {k: f.result() for k, f in futures.items()}
         if not all(coords.values()):
             raise ValueError("Failed to geocode one or more locations")
         
-        leg1 = self.get_route_leg(coords['current'], coords['pickup'])
-        leg2 = self.get_route_leg(coords['pickup'], coords['dropoff'])
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            leg1_future = ex.submit(self.get_route_leg, coords['current'], coords['pickup'])
+            leg2_future = ex.submit(self.get_route_leg, coords['pickup'], coords['dropoff'])
+            leg1, leg2 = leg1_future.result(), leg2_future.result()
         if not (leg1 and leg2):
             raise ValueError("Failed to calculate route")
         
@@ -88,7 +177,9 @@ class ELDLogGenerator:
             'total_distance': leg1['distance'] + leg2['distance'],
             'total_duration': leg1['duration'] + leg2['duration']
         }
-        logger.info(f"Route calculated: {self.route_details}")
+        logger.info("Route calculated: %s mi, %s hr", self.route_details['total_distance'], self.route_details['total_duration'])
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Route details: %s", self.route_details)
         return self.route_details
 
     def generate_log_sheets(self):
@@ -99,12 +190,26 @@ class ELDLogGenerator:
         total_distance = self.route_details['total_distance']
         driving_time = self.route_details['total_duration']
         fuel_stops = max(0, int(total_distance / self.fuel_interval))
-        logger.info(f"Total Distance: {total_distance}, Driving Time: {driving_time}, Fuel Stops: {fuel_stops}")
+        logger.info("Total Distance: %s, Driving Time: %s, Fuel Stops: %s", total_distance, driving_time, fuel_stops)
         
         current_time = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0)
         remaining_cycle = self.max_cycle_hours - self.current_cycle_used
         day_log = self._init_day_log(current_time.date())
         
+        if remaining_cycle <= 0:
+            # Cycle exhausted: take the 34-hour restart once up front (rest of today off,
+            # the remainder tomorrow) instead of rolling rest days in _add_driving
+            midnight = current_time.replace(hour=0, minute=0) + timedelta(days=1)
+            off_today = (midnight - current_time).total_seconds() / 3600
+            # Written directly: _add_event would treat an event ending at midnight as crossing the day
+            day_log['events'].append({'status': 'Off duty', 'start': current_time.strftime('%H:%M'), 'end': '24:00',
+                                      'duration': off_today, 'activity': "34-hour restart"})
+            day_log['totals']['off_duty'] += off_today
+            self._finalize_day(day_log)
+            day_log = self._init_day_log(midnight.date())
+            current_time, day_log = self._add_event(day_log, 'Off duty', midnight, self.restart_hours - off_today, "34-hour restart")
+            remaining_cycle = self.max_cycle_hours
+        
         current_time, day_log = self._add_event(day_log, 'On duty', current_time, self.pickup_dropoff_time, "Loading")
         leg1_time = self.route_details['legs'][0]['duration']
         current_time, day_log, remaining_cycle = self._add_driving(day_log, current_time, leg1_time, remaining_cycle)
@@ -119,13 +224,18 @@ class ELDLogGenerator:
         
         current_time, day_log = self._add_event(day_log, 'On duty', current_time, self.pickup_dropoff_time, "Unloading")
         self._finalize_day(day_log)
-        logger.info(f"Log sheets generated: {self.log_sheets}")
+        logger.info("Log sheets generated: %d", len(self.log_sheets))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Log sheets: %s", self.log_sheets)
         return {'route_details': self.route_details, 'log_sheets': self.log_sheets}
 
     def _init_day_log(self, date):
         return {
             'date': date.strftime('%Y-%m-%d'),
-            'grid': ['OFF'] * 96,
+            # Not JSON-safe; callers pop this before persisting or rendering
+            '_date_obj': date,
+            # Filled as int codes; decoded to labels in _finalize_day
+            'grid': bytearray(GRID_SLOTS),
             'events': [],
             'totals': {'driving': 0, 'on_duty': 0, 'off_duty': 0, 'sleeper': 0}
         }
@@ -142,17 +252,13 @@ class ELDLogGenerator:
         if activity:
             event['activity'] = activity
         
-        start_idx = int((start_time.hour * 4) + (start_time.minute / 15))
-        end_idx = int((end_time.hour * 4) + (end_time.minute / 15))
-        status_code = {'Driving': 'D', 'On duty': 'ON', 'Off duty': 'OFF', 'Sleeper berth': 'SB'}[status]
-        
-        for i in range(start_idx, min(end_idx, 96)):
-            day_log['grid'][i] = status_code
+        start_idx = (start_time.hour * 60 + start_time.minute) // 15
+        end_idx = min((end_time.hour * 60 + end_time.minute) // 15, GRID_SLOTS)
+        if end_idx > start_idx:
+            day_log['grid'][start_idx:end_idx] = bytes((_STATUS_CODE[status],)) * (end_idx - start_idx)
         
         day_log['events'].append(event)
-        # Fix: Use 'sleeper' instead of 'sleeper_berth'
-        total_key = 'sleeper' if status == 'Sleeper berth' else status.lower().replace(' ', '_')
-        day_log['totals'][total_key] += duration_hours
+        day_log['totals'][_TOTAL_KEY[status]] += duration_hours
         return end_time, day_log
 
     def _add_driving(self, day_log, start_time, drive_time, remaining_cycle):
@@ -175,4 +281,8 @@ class ELDLogGenerator:
         return start_time, day_log, remaining_cycle
 
     def _finalize_day(self, day_log):
+        codes = day_log['grid']
+        # Packed form for persistence; popped with _date_obj before the response is rendered
+        day_log['_grid_packed'] = pack_codes(codes)
+        day_log['grid'] = [GRID_LABELS[code] for code in codes]
         self.log_sheets.append(day_log)
\ No newline at end of file